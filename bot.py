@@ -13,7 +13,7 @@ Single file. Does everything:
         /help        → shows all commands
 
 Setup:
-  1. pip install python-binance python-telegram-bot requests
+  1. pip install python-binance python-telegram-bot aiohttp numpy numba orjson uvloop
   2. Create a bot via @BotFather on Telegram, grab the TOKEN
   3. Get your CHAT_ID (send a message to the bot, then use
      https://api.telegram.org/bot<TOKEN>/getUpdates to find it)
@@ -21,11 +21,15 @@ Setup:
   5. python bot.py
 """
 
-import os, json, time, logging, asyncio
+import os, sys, time, logging, asyncio, functools, heapq
 from datetime import datetime, timezone
-from typing import Any
+from operator import itemgetter
+from typing import Any, Callable
 
-import requests
+import aiohttp
+import numpy as np
+import orjson
+from numba import njit
 from telegram import Update
 from telegram.ext import ApplicationBuilder, CommandHandler, ContextTypes
 
@@ -36,7 +40,15 @@ TELEGRAM_TOKEN  = os.environ.get("TELEGRAM_TOKEN",  "YOUR_TOKEN_HERE")
 TELEGRAM_CHAT   = os.environ.get("TELEGRAM_CHAT_ID","YOUR_CHAT_ID_HERE")
 SCAN_INTERVAL   = int(os.environ.get("SCAN_INTERVAL_MIN", "60"))   # minutes
 BINANCE_BASE    = "https://fapi.binance.com"
+BINANCE_WS      = "wss://fstream.binance.com/stream?streams=!ticker@arr/!markPrice@arr@1s"
+STREAM_STALE    = 60    # seconds of stream silence before scans fall back to REST
 TOP_N           = 100   # how many pairs to scan (by 24h volume)
+# pairs fetched in parallel (1–16); capped to stay under the Binance weight limit
+SCAN_CONCURRENCY = max(1, min(int(os.environ.get("SCAN_CONCURRENCY", "10")), 16))
+HTTP_TIMEOUT    = aiohttp.ClientTimeout(connect=3, sock_read=10, total=15)
+HTTP_RETRIES    = 3     # retries on 429/5xx and dropped connections
+HTTP_BACKOFF    = 0.3   # seconds; doubles on each retry
+RETRY_STATUSES  = {429, 500, 502, 503, 504}
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
 log = logging.getLogger(__name__)
@@ -45,41 +57,150 @@ log = logging.getLogger(__name__)
 # SHARED STATE  — latest scan results, updated in place
 # ─────────────────────────────────────────────────────────────
 latest_scan: dict[str, Any] = {}
+_session: aiohttp.ClientSession | None = None   # kept open so connections are reused
+_scan_task: asyncio.Task | None = None          # scan in progress, shared by callers
+_background: list[asyncio.Task] = []            # long-running tasks, cancelled on shutdown
+
+# Pushed by the Binance WebSocket streams (see stream_market_state)
+ticker_state: dict[str, dict[str, Any]] = {}    # symbol → parsed 24h ticker
+funding_state: dict[str, float] = {}            # symbol → last funding rate
+_stream_seen = 0.0                              # monotonic time of last stream message
 
 
 # ═══════════════════════════════════════════════════════════════
 # SECTION 1 — BINANCE DATA FETCHERS
 # ═══════════════════════════════════════════════════════════════
 
-def get_top_symbols() -> list[str]:
-    """Top N USDT perpetual symbols sorted by 24-h volume."""
-    r = requests.get(f"{BINANCE_BASE}/fapi/v1/ticker/24hr", timeout=15)
-    r.raise_for_status()
-    tickers = r.json()
-    usdt = [t for t in tickers if t["symbol"].endswith("USDT")]
-    usdt.sort(key=lambda t: float(t.get("quoteVolume", 0)), reverse=True)
-    return [t["symbol"] for t in usdt[:TOP_N]]
+def ttl_cache(ttl: float, maxsize: int = 256, key: Callable[..., Any] = lambda *a: a):
+    """Memoize a coroutine for `ttl` seconds. `key` maps the call args to a cache key.
+
+    The running task is cached, so concurrent callers with the same key share
+    one call instead of each missing; failed calls are dropped from the cache.
+    """
+    def decorator(fn):
+        cache: dict[Any, tuple[float, asyncio.Future]] = {}
+
+        @functools.wraps(fn)
+        async def wrapper(*args):
+            k = key(*args)
+            now = time.monotonic()
+            hit = cache.get(k)
+            if hit and hit[0] > now:
+                return await asyncio.shield(hit[1])
+
+            task = asyncio.ensure_future(fn(*args))
+
+            def drop_failed(t: asyncio.Future) -> None:
+                if (t.cancelled() or t.exception() is not None) and cache.get(k, (0, None))[1] is t:
+                    del cache[k]
+
+            task.add_done_callback(drop_failed)
+            if len(cache) >= maxsize:
+                for stale in [c for c, (exp, _) in cache.items() if exp <= now]:
+                    del cache[stale]
+                if len(cache) >= maxsize:
+                    del cache[next(iter(cache))]   # oldest insert
+            cache[k] = (now + ttl, task)
+            # shield: a cancelled caller must not cancel the call others await
+            return await asyncio.shield(task)
+
+        wrapper.cache_clear = cache.clear
+        return wrapper
+    return decorator
+
+
+def get_session() -> aiohttp.ClientSession:
+    """Process-wide HTTP session, so keep-alive connections survive between scans."""
+    global _session
+    if _session is None or _session.closed:
+        _session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=32, limit_per_host=16, keepalive_timeout=60, ttl_dns_cache=300,
+            ),
+            headers={"Accept-Encoding": "gzip"},
+        )
+    return _session
+
+
+async def warm_pool() -> None:
+    """Resolve DNS and open a connection to Binance before the first scan needs it."""
+    try:
+        async with get_session().head(BINANCE_BASE, timeout=HTTP_TIMEOUT):
+            pass
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        log.warning("Connection pre-warm failed — %s", e)
+
+
+async def close_session() -> None:
+    global _session
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
+
+
+async def _get_json(session: aiohttp.ClientSession, path: str,
+                    params: dict | None = None,
+                    timeout: aiohttp.ClientTimeout = HTTP_TIMEOUT) -> Any:
+    """GET a Binance endpoint and decode the JSON body, retrying transient failures."""
+    for attempt in range(HTTP_RETRIES + 1):
+        retry = attempt < HTTP_RETRIES
+        delay = HTTP_BACKOFF * 2 ** attempt
+        try:
+            async with session.get(f"{BINANCE_BASE}{path}", params=params, timeout=timeout) as r:
+                # 418 (IP ban) is not in RETRY_STATUSES, so it is raised, never retried
+                if not (retry and r.status in RETRY_STATUSES):
+                    r.raise_for_status()
+                    return orjson.loads(await r.read())
+                if r.status in (429, 503):
+                    # Retrying before Retry-After is what escalates a 429 into a ban
+                    delay = max(delay, _retry_after(r.headers))
+        except aiohttp.ClientConnectionError:
+            if not retry:
+                raise
+        await asyncio.sleep(delay)
+
+
+def _retry_after(headers: Any) -> float:
+    """Seconds from a Retry-After header; 0 if missing or not a number."""
+    try:
+        return float(headers.get("Retry-After", 0))
+    except ValueError:
+        return 0.0
+
+
+def _parse_ticker(t: dict) -> dict[str, Any]:
+    """24h ticker row → the fields we use. Numbers are parsed once; the last
+    price stays the exchange's string so /check shows it exactly as quoted."""
+    return {
+        "qv":   float(t.get("quoteVolume", 0)),
+        "pc":   float(t.get("priceChangePercent", 0)),
+        "last": t.get("lastPrice"),
+    }
+
+
+async def fetch_tickers(session: aiohttp.ClientSession) -> dict[str, dict[str, Any]]:
+    """Parsed 24h ticker for every symbol, from one call."""
+    data = await _get_json(session, "/fapi/v1/ticker/24hr")
+    return {t["symbol"]: _parse_ticker(t) for t in data}
+
+
+def get_top_symbols(tickers: dict[str, dict[str, Any]]) -> dict[str, dict[str, Any]]:
+    """Top N USDT perpetual symbols sorted by 24-h volume → their parsed ticker."""
+    usdt = [(sym, t) for sym, t in tickers.items() if sym.endswith("USDT")]
+    usdt.sort(key=lambda st: st[1]["qv"], reverse=True)
+    return dict(usdt[:TOP_N])
 
 
-def fetch_klines(symbol: str, interval: str, limit: int = 60) -> list[float]:
+async def fetch_klines(session: aiohttp.ClientSession, symbol: str,
+                       interval: str, limit: int = 60) -> np.ndarray:
     """Close prices for one symbol + interval."""
-    r = requests.get(
-        f"{BINANCE_BASE}/fapi/v1/klines",
-        params={"symbol": symbol, "interval": interval, "limit": limit},
-        timeout=10,
-    )
-    r.raise_for_status()
-    return [float(k[3]) for k in r.json()]
+    data = await _get_json(session, "/fapi/v1/klines",
+                           {"symbol": symbol, "interval": interval, "limit": limit})
+    return np.fromiter((float(k[4]) for k in data), dtype=np.float64, count=len(data))
 
 
-def fetch_funding_rate(symbol: str) -> float | None:
-    r = requests.get(
-        f"{BINANCE_BASE}/fapi/v1/premiumIndex",
-        params={"symbol": symbol},
-        timeout=10,
-    )
-    r.raise_for_status()
-    data = r.json()
+async def fetch_funding_rate(session: aiohttp.ClientSession, symbol: str) -> float | None:
+    data = await _get_json(session, "/fapi/v1/premiumIndex", {"symbol": symbol})
     if isinstance(data, list):
         data = data[0]
     try:
@@ -88,25 +209,33 @@ def fetch_funding_rate(symbol: str) -> float | None:
         return None
 
 
-def fetch_oi_hist(symbol: str) -> list[dict]:
-    """Last 2 hourly OI snapshots."""
-    r = requests.get(
-        f"{BINANCE_BASE}/futures/data/openInterestHist",
-        params={"symbol": symbol, "period": "1h", "limit": 2},
-        timeout=10,
-    )
-    r.raise_for_status()
-    return r.json()
+async def fetch_funding_rates(session: aiohttp.ClientSession) -> dict[str, float]:
+    """Last funding rate for every symbol, from one premiumIndex call."""
+    data = await _get_json(session, "/fapi/v1/premiumIndex")
+    rates = {}
+    for row in data:
+        try:
+            rates[row["symbol"]] = float(row["lastFundingRate"])
+        except (KeyError, TypeError, ValueError):
+            pass
+    return rates
 
 
-def fetch_long_short_ratio(symbol: str) -> float | None:
-    r = requests.get(
-        f"{BINANCE_BASE}/futures/data/topLongShortRatio",
-        params={"symbol": symbol, "period": "1h", "limit": 1},
-        timeout=10,
-    )
-    r.raise_for_status()
-    data = r.json()
+def _oi_hour() -> int:
+    """Current hourly OI snapshot bucket; rolls over 2 min past the hour so the new one exists."""
+    return int((time.time() - 120) // 3600)
+
+
+@ttl_cache(ttl=60 * 60, key=lambda session, symbol: (symbol, _oi_hour()))
+async def fetch_oi_hist(session: aiohttp.ClientSession, symbol: str) -> list[dict]:
+    """Last 2 hourly OI snapshots (cached until the next hourly snapshot)."""
+    return await _get_json(session, "/futures/data/openInterestHist",
+                           {"symbol": symbol, "period": "1h", "limit": 2})
+
+
+async def fetch_long_short_ratio(session: aiohttp.ClientSession, symbol: str) -> float | None:
+    data = await _get_json(session, "/futures/data/topLongShortRatio",
+                           {"symbol": symbol, "period": "1h", "limit": 1})
     if data:
         try:
             return float(data[0]["longShortRatio"])
@@ -115,180 +244,295 @@ def fetch_long_short_ratio(symbol: str) -> float | None:
     return None
 
 
-def fetch_ticker(symbol: str) -> dict | None:
-    r = requests.get(
-        f"{BINANCE_BASE}/fapi/v1/ticker/24hr",
-        params={"symbol": symbol},
-        timeout=10,
-    )
-    r.raise_for_status()
-    return r.json()
+async def fetch_ticker(session: aiohttp.ClientSession, symbol: str) -> dict[str, Any]:
+    return _parse_ticker(await _get_json(session, "/fapi/v1/ticker/24hr", {"symbol": symbol}))
+
+
+def stream_live() -> bool:
+    return time.monotonic() - _stream_seen < STREAM_STALE
+
+
+async def stream_market_state() -> None:
+    """Background task: keep ticker_state / funding_state current from Binance streams."""
+    global _stream_seen
+    session = get_session()
+    while True:
+        try:
+            async with session.ws_connect(BINANCE_WS, heartbeat=30) as ws:
+                # Streams only push symbols that changed, so seed the full set once.
+                # Rebuild rather than merge so delisted symbols don't linger.
+                tickers, funding = await asyncio.gather(
+                    fetch_tickers(session),
+                    fetch_funding_rates(session),
+                )
+                ticker_state.clear()
+                ticker_state.update(tickers)
+                funding_state.clear()
+                funding_state.update(funding)
+                log.info("Market stream connected.")
+
+                async for msg in ws:
+                    if msg.type != aiohttp.WSMsgType.TEXT:
+                        break
+                    payload = orjson.loads(msg.data)
+                    if payload["stream"].startswith("!ticker"):
+                        for t in payload["data"]:
+                            ticker_state[t["s"]] = {
+                                "qv": float(t["q"]), "pc": float(t["P"]), "last": t["c"],
+                            }
+                    else:
+                        for m in payload["data"]:
+                            if m.get("r"):
+                                funding_state[m["s"]] = float(m["r"])
+                    _stream_seen = time.monotonic()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            log.warning("Market stream error — %s", e)
+        log.warning("Market stream closed, reconnecting in 5 s …")
+        await asyncio.sleep(5)
+
+
+async def market_snapshot(session: aiohttp.ClientSession
+                          ) -> tuple[dict[str, dict[str, Any]], dict[str, float]]:
+    """All tickers and funding rates: from the streams if live, else via REST."""
+    if stream_live():
+        return dict(ticker_state), dict(funding_state)
+    tickers, funding = await asyncio.gather(fetch_tickers(session), fetch_funding_rates(session))
+    return tickers, funding
 
 
 # ═══════════════════════════════════════════════════════════════
 # SECTION 2 — RSI CALCULATOR
 # ═══════════════════════════════════════════════════════════════
 
-def calc_rsi(closes: list[float], period: int = 14) -> float | None:
-    if len(closes) < period + 1:
-        return None
-    changes = [closes[i] - closes[i - 1] for i in range(1, len(closes))]
-    gains  = [max(c, 0.0) for c in changes]
-    losses = [abs(min(c, 0.0)) for c in changes]
-
-    avg_g = sum(gains[:period]) / period
-    avg_l = sum(losses[:period]) / period
-    for i in range(period, len(changes)):
-        avg_g = (avg_g * (period - 1) + gains[i]) / period
-        avg_l = (avg_l * (period - 1) + losses[i]) / period
+@njit(cache=True, fastmath=True)
+def _rsi_core(closes: np.ndarray, period: int) -> float:
+    """Wilder RSI in a single pass; caller guarantees len(closes) > period."""
+    avg_g = 0.0
+    avg_l = 0.0
+    for i in range(1, period + 1):
+        c = closes[i] - closes[i - 1]
+        if c > 0:
+            avg_g += c
+        else:
+            avg_l -= c
+    avg_g /= period
+    avg_l /= period
+    for i in range(period + 1, len(closes)):
+        c = closes[i] - closes[i - 1]
+        avg_g = (avg_g * (period - 1) + max(c, 0.0)) / period
+        avg_l = (avg_l * (period - 1) + max(-c, 0.0)) / period
 
     if avg_l == 0:
         return 100.0
     rs = avg_g / avg_l
-    return round(100 - (100 / (1 + rs)), 2)
+    return 100 - (100 / (1 + rs))
+
+
+def calc_rsi(closes: np.ndarray, period: int = 14) -> float | None:
+    if len(closes) < period + 1:
+        return None
+    return round(_rsi_core(np.ascontiguousarray(closes, dtype=np.float64), period), 2)
+
+
+# Compile (or load from cache) now so the first scan doesn't pay for it
+_rsi_core(np.arange(16, dtype=np.float64), 14)
 
 
 # ═══════════════════════════════════════════════════════════════
 # SECTION 3 — SCORING FUNCTIONS
 # ═══════════════════════════════════════════════════════════════
-
-def score_rsi(rsi: float | None, weight: float) -> float:
-    if rsi is None:
-        return 0.0
-    if rsi <= 30:
-        return weight
-    if rsi >= 70:
-        return -weight
-    if rsi < 50:
-        return weight * (50 - rsi) / 20.0
-    return -weight * (rsi - 50) / 20.0
+# Each scorer works on a whole batch of pairs at once: inputs are
+# float arrays with NaN for missing data, which always scores 0.
+
+def score_rsi(rsi: np.ndarray, weight: float) -> np.ndarray:
+    return np.select(
+        [np.isnan(rsi), rsi <= 30, rsi >= 70, rsi < 50],
+        [0.0, weight, -weight, weight * (50 - rsi) / 20.0],
+        -weight * (rsi - 50) / 20.0,
+    )
 
 
-def score_funding(fr: float | None, weight: float = 25) -> float:
-    if fr is None:
-        return 0.0
+def score_funding(fr: np.ndarray, weight: float = 25) -> np.ndarray:
     threshold = 0.0005          # 0.05 %
-    if fr <= -threshold:
-        return weight
-    if fr >= threshold:
-        return -weight
-    return -weight * (fr / threshold)
+    return np.select(
+        [np.isnan(fr), fr <= -threshold, fr >= threshold],
+        [0.0, weight, -weight],
+        -weight * (fr / threshold),
+    )
+
+
+def score_oi_change(oi_chg: np.ndarray, price_chg_pct: np.ndarray, weight: float = 15) -> np.ndarray:
+    return np.select(
+        [np.isnan(oi_chg),
+         (oi_chg > 0.03) & (price_chg_pct > 1),
+         (oi_chg > 0.03) & (price_chg_pct < -1),
+         oi_chg < -0.03],
+        [0.0, weight, -weight, np.where(price_chg_pct > 0, -weight * 0.4, weight * 0.4)],
+        0.0,
+    )
+
+
+def score_long_short(ratio: np.ndarray, weight: float = 10) -> np.ndarray:
+    mid = 1.15
+    return np.select(
+        [np.isnan(ratio), ratio <= 0.8, ratio >= 1.5, ratio < mid],
+        [0.0, weight, -weight, weight * (mid - ratio) / (mid - 0.8)],
+        -weight * (ratio - mid) / (1.5 - mid),
+    )
+
+
+def score_price_change(pct: np.ndarray, weight: float = 10) -> np.ndarray:
+    return np.select(
+        [(-5 <= pct) & (pct <= 0), (5 <= pct) & (pct <= 10), pct < -5, pct > 10],
+        [weight * 0.5, -weight * 0.5, weight, -weight],
+        0.0,
+    )
 
 
-def score_oi_change(symbol: str, price_chg_pct: float, weight: float = 15) -> float:
-    hist = fetch_oi_hist(symbol)
+def oi_change(hist: list[dict]) -> float | None:
+    """Fractional change between the two OI snapshots, None if unusable."""
     if len(hist) < 2:
-        return 0.0
+        return None
     try:
         prev = float(hist[0]["sumOpenInterest"])
         now  = float(hist[1]["sumOpenInterest"])
     except (KeyError, TypeError):
-        return 0.0
+        return None
     if prev == 0:
-        return 0.0
-    oi_chg = (now - prev) / prev
-
-    if oi_chg > 0.03 and price_chg_pct > 1:
-        return weight
-    if oi_chg > 0.03 and price_chg_pct < -1:
-        return -weight
-    if oi_chg < -0.03:
-        return -weight * 0.4 if price_chg_pct > 0 else weight * 0.4
-    return 0.0
-
-
-def score_long_short(ratio: float | None, weight: float = 10) -> float:
-    if ratio is None:
-        return 0.0
-    if ratio <= 0.8:
-        return weight
-    if ratio >= 1.5:
-        return -weight
-    mid = 1.15
-    if ratio < mid:
-        return weight * (mid - ratio) / (mid - 0.8)
-    return -weight * (ratio - mid) / (1.5 - mid)
-
-
-def score_price_change(pct: float, weight: float = 10) -> float:
-    if -5 <= pct <= 0:
-        return weight * 0.5
-    if 5 <= pct <= 10:
-        return -weight * 0.5
-    if pct < -5:
-        return weight
-    if pct > 10:
-        return -weight
-    return 0.0
+        return None
+    return (now - prev) / prev
 
 
 # ═══════════════════════════════════════════════════════════════
-# SECTION 4 — SCAN ONE PAIR
+# SECTION 4 — FETCH + SCORE PAIRS
 # ═══════════════════════════════════════════════════════════════
 
-def scan_pair(symbol: str) -> dict[str, Any]:
-    ticker         = fetch_ticker(symbol)
-    price_chg_pct  = float(ticker.get("priceChangePercent", 0)) if ticker else 0.0
-
-    closes_1h      = fetch_klines(symbol, "1h", 60)
-    closes_4h      = fetch_klines(symbol, "4h", 60)
-    rsi_1h         = calc_rsi(closes_1h)
-    rsi_4h         = calc_rsi(closes_4h)
-    fr             = fetch_funding_rate(symbol)
-    ls_ratio       = fetch_long_short_ratio(symbol)
-
-    s_rsi1  = score_rsi(rsi_1h, 25)
-    s_rsi4  = score_rsi(rsi_4h, 15)
-    s_fr    = score_funding(fr, 25)
-    s_oi    = score_oi_change(symbol, price_chg_pct, 15)
-    s_ls    = score_long_short(ls_ratio, 10)
-    s_pc    = score_price_change(price_chg_pct, 10)
-    total   = round(s_rsi1 + s_rsi4 + s_fr + s_oi + s_ls + s_pc, 2)
-
-    signal = "PUMP" if total >= 35 else ("DUMP" if total <= -35 else "NEUTRAL")
+async def fetch_pair(session: aiohttp.ClientSession, symbol: str,
+                     ticker: dict[str, Any], fr: float | None) -> dict[str, Any]:
+    """Raw signal inputs for one pair. Ticker row and funding rate come from the bulk fetches."""
+    closes_1h, oi_hist, ls_ratio = await asyncio.gather(
+        fetch_klines(session, symbol, "1h", 240),
+        fetch_oi_hist(session, symbol),
+        fetch_long_short_ratio(session, symbol),
+    )
+    # 4h closes = last 1h close of each 4-bar group, saving a klines call.
+    # Groups end at the newest bar rather than on Binance's 4h boundaries.
+    closes_4h = closes_1h[(len(closes_1h) - 1) % 4::4]
 
     return {
-        "symbol":            symbol,
-        "score":             total,
-        "signal":            signal,
-        "rsi_1h":            rsi_1h,
-        "rsi_4h":            rsi_4h,
-        "funding_rate_pct":  round(fr * 100, 4) if fr else None,
-        "long_short_ratio":  ls_ratio,
-        "price_change_24h":  price_chg_pct,
-        "last_price":        ticker.get("lastPrice") if ticker else None,
-        "breakdown": {
-            "rsi_1h":     round(s_rsi1, 2),
-            "rsi_4h":     round(s_rsi4, 2),
-            "funding":    round(s_fr, 2),
-            "oi_change":  round(s_oi, 2),
-            "long_short": round(s_ls, 2),
-            "price_chg":  round(s_pc, 2),
-        },
+        "symbol":    symbol,
+        "rsi_1h":    calc_rsi(closes_1h[-60:]),
+        "rsi_4h":    calc_rsi(closes_4h),
+        "fr":        fr,
+        "oi_chg":    oi_change(oi_hist),
+        "ls_ratio":  ls_ratio,
+        "price_chg": ticker["pc"],
+        "last":      ticker["last"],
     }
 
 
+def score_pairs(raws: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Score a batch of fetch_pair() outputs in one pass over column arrays."""
+    if not raws:
+        return []
+
+    def col(name: str) -> np.ndarray:
+        return np.array([np.nan if r[name] is None else r[name] for r in raws], dtype=np.float64)
+
+    price_chg = col("price_chg")
+    s_rsi1 = score_rsi(col("rsi_1h"), 25)
+    s_rsi4 = score_rsi(col("rsi_4h"), 15)
+    s_fr   = score_funding(col("fr"), 25)
+    s_oi   = score_oi_change(col("oi_chg"), price_chg, 15)
+    s_ls   = score_long_short(col("ls_ratio"), 10)
+    s_pc   = score_price_change(price_chg, 10)
+    totals = (s_rsi1 + s_rsi4 + s_fr + s_oi + s_ls + s_pc).tolist()
+
+    breakdowns = zip(*(a.tolist() for a in (s_rsi1, s_rsi4, s_fr, s_oi, s_ls, s_pc)))
+    records = []
+    for r, total, bd in zip(raws, totals, breakdowns):
+        fr = r["fr"]
+        records.append({
+            "symbol":            r["symbol"],
+            "score":             total,
+            "signal":            "PUMP" if total >= 35 else ("DUMP" if total <= -35 else "NEUTRAL"),
+            "rsi_1h":            r["rsi_1h"],
+            "rsi_4h":            r["rsi_4h"],
+            "funding_rate_pct":  None if fr is None else round(fr * 100, 4),
+            "long_short_ratio":  r["ls_ratio"],
+            "price_change_24h":  r["price_chg"],
+            "last_price":        r["last"],
+            "breakdown": dict(zip(
+                ("rsi_1h", "rsi_4h", "funding", "oi_change", "long_short", "price_chg"), bd)),
+        })
+    return records
+
+
+async def scan_pair(session: aiohttp.ClientSession, symbol: str,
+                    ticker: dict[str, Any], fr: float | None) -> dict[str, Any]:
+    """Fetch and score one pair."""
+    return score_pairs([await fetch_pair(session, symbol, ticker, fr)])[0]
+
+
+@ttl_cache(ttl=60, key=lambda session, symbol: symbol)
+async def scan_symbol(session: aiohttp.ClientSession, symbol: str) -> dict[str, Any]:
+    """Score a single pair outside a full scan (e.g. /check); cached for a minute."""
+    if stream_live() and symbol in ticker_state:
+        return await scan_pair(session, symbol, ticker_state[symbol], funding_state.get(symbol))
+    ticker, fr = await asyncio.gather(
+        fetch_ticker(session, symbol),
+        fetch_funding_rate(session, symbol),
+    )
+    return await scan_pair(session, symbol, ticker, fr)
+
+
 # ═══════════════════════════════════════════════════════════════
 # SECTION 5 — FULL MARKET SCAN
 # ═══════════════════════════════════════════════════════════════
 
-def run_scan() -> dict[str, Any]:
-    global latest_scan
-    log.info("Starting scan …")
-    symbols = get_top_symbols()
-    log.info("Scanning %d pairs …", len(symbols))
+async def run_scan() -> dict[str, Any]:
+    """Run a full scan, or join the one already in progress."""
+    global _scan_task
+    if _scan_task is None or _scan_task.done():
+        _scan_task = asyncio.ensure_future(_run_scan())
+    # shield: a cancelled caller must not cancel the scan other callers await
+    return await asyncio.shield(_scan_task)
 
-    results = []
-    for sym in symbols:
-        try:
-            results.append(scan_pair(sym))
-        except Exception as e:
-            log.warning("Skip %s — %s", sym, e)
-
-    results.sort(key=lambda r: r["score"], reverse=True)
 
-    pumps = [r for r in results if r["signal"] == "PUMP"]
-    dumps = [r for r in results if r["signal"] == "DUMP"]
+async def _run_scan() -> dict[str, Any]:
+    global latest_scan
+    log.info("Starting scan …")
+    sem = asyncio.Semaphore(SCAN_CONCURRENCY)
+
+    async def bounded(session: aiohttp.ClientSession, sym: str,
+                      ticker: dict[str, Any], fr: float | None) -> dict[str, Any] | None:
+        async with sem:
+            try:
+                return await fetch_pair(session, sym, ticker, fr)
+            except Exception as e:
+                log.warning("Skip %s — %s", sym, e)
+                return None
+
+    session = get_session()
+    all_tickers, funding = await market_snapshot(session)
+    tickers = get_top_symbols(all_tickers)
+    log.info("Scanning %d pairs …", len(tickers))
+    fetched = await asyncio.gather(*(
+        bounded(session, sym, ticker, funding.get(sym))
+        for sym, ticker in tickers.items()
+    ))
+
+    results = score_pairs([r for r in fetched if r is not None])
+
+    # Unsorted; formatters pick their top-k with heapq
+    pumps, dumps = [], []
+    for r in results:
+        if r["signal"] == "PUMP":
+            pumps.append(r)
+        elif r["signal"] == "DUMP":
+            dumps.append(r)
 
     latest_scan = {
         "scan_time":     datetime.now(timezone.utc).isoformat(),
@@ -306,6 +550,9 @@ def run_scan() -> dict[str, Any]:
 # SECTION 6 — MESSAGE FORMATTERS
 # ═══════════════════════════════════════════════════════════════
 
+_by_score = itemgetter("score")
+
+
 def confidence(record: dict) -> str:
     bd = record["breakdown"]
     strong = sum(1 for v in bd.values() if abs(v) >= 8)
@@ -320,9 +567,9 @@ def fmt_pump_list(pairs: list[dict], limit: int = 5) -> str:
     if not pairs:
         return "⚪ No pump candidates right now."
     lines = []
-    for p in pairs[:limit]:
+    for p in heapq.nlargest(limit, pairs, key=_by_score):
         lines.append(
-            f"🟢 *{p['symbol']}*  |  Score: {p['score']}  |  Confidence: {confidence(p)}\n"
+            f"🟢 *{p['symbol']}*  |  Score: {p['score']:.2f}  |  Confidence: {confidence(p)}\n"
             f"    RSI 1h: {p['rsi_1h']} · FR: {p['funding_rate_pct']}% · L/S: {p['long_short_ratio']} · 24h: {p['price_change_24h']}%"
         )
     return "\n".join(lines)
@@ -332,9 +579,9 @@ def fmt_dump_list(pairs: list[dict], limit: int = 5) -> str:
     if not pairs:
         return "⚪ No dump candidates right now."
     lines = []
-    for p in pairs[:limit]:
+    for p in heapq.nsmallest(limit, pairs, key=_by_score):
         lines.append(
-            f"🔴 *{p['symbol']}*  |  Score: {p['score']}  |  Confidence: {confidence(p)}\n"
+            f"🔴 *{p['symbol']}*  |  Score: {p['score']:.2f}  |  Confidence: {confidence(p)}\n"
             f"    RSI 1h: {p['rsi_1h']} · FR: {p['funding_rate_pct']}% · L/S: {p['long_short_ratio']} · 24h: {p['price_change_24h']}%"
         )
     return "\n".join(lines)
@@ -346,41 +593,43 @@ def fmt_detail(record: dict) -> str:
     return (
         f"📊 *{record['symbol']} — Full Breakdown*\n\n"
         f"Signal: {sig_emoji}\n"
-        f"Total Score: {record['score']} / 100  |  Confidence: {confidence(record)}\n\n"
+        f"Total Score: {record['score']:.2f} / 100  |  Confidence: {confidence(record)}\n\n"
         f"━━━ Signals ━━━\n"
-        f"RSI 1h:          {record['rsi_1h']}       →  {bd['rsi_1h']:+}\n"
-        f"RSI 4h:          {record['rsi_4h']}       →  {bd['rsi_4h']:+}\n"
-        f"Funding Rate:    {record['funding_rate_pct']}%   →  {bd['funding']:+}\n"
-        f"OI Change:       —           →  {bd['oi_change']:+}\n"
-        f"Long/Short:      {record['long_short_ratio']}       →  {bd['long_short']:+}\n"
-        f"24h Price Chg:   {record['price_change_24h']}%  →  {bd['price_chg']:+}\n\n"
+        f"RSI 1h:          {record['rsi_1h']}       →  {bd['rsi_1h']:+.2f}\n"
+        f"RSI 4h:          {record['rsi_4h']}       →  {bd['rsi_4h']:+.2f}\n"
+        f"Funding Rate:    {record['funding_rate_pct']}%   →  {bd['funding']:+.2f}\n"
+        f"OI Change:       —           →  {bd['oi_change']:+.2f}\n"
+        f"Long/Short:      {record['long_short_ratio']}       →  {bd['long_short']:+.2f}\n"
+        f"24h Price Chg:   {record['price_change_24h']}%  →  {bd['price_chg']:+.2f}\n\n"
         f"Last Price: ${record['last_price']}\n"
         f"⚠️ Technical signals only. Use stop-losses."
     )
 
 
+_alert_fields = itemgetter("symbol", "score", "rsi_1h", "funding_rate_pct")
+_ALERT_LINE   = "  • *{}*  Score: {:.2f}  |  RSI: {}  |  FR: {}%"
+
+
 def fmt_alert(scan: dict) -> str:
     t      = scan["scan_time"][:16]
-    pumps  = scan["pumps"][:3]
-    dumps  = scan["dumps"][:3]
+    pumps  = heapq.nlargest(3, scan["pumps"], key=_by_score)
+    dumps  = heapq.nsmallest(3, scan["dumps"], key=_by_score)
 
-    msg = f"📊 *Crypto Scan — {t} UTC*\nPairs scanned: {scan['pairs_scanned']}\n\n"
+    parts = [f"📊 *Crypto Scan — {t} UTC*", f"Pairs scanned: {scan['pairs_scanned']}", ""]
 
     if pumps:
-        msg += "🟢 *Top Pumps*\n"
-        for p in pumps:
-            msg += f"  • *{p['symbol']}*  Score: {p['score']}  |  RSI: {p['rsi_1h']}  |  FR: {p['funding_rate_pct']}%\n"
+        parts.append("🟢 *Top Pumps*")
+        parts.extend(_ALERT_LINE.format(*_alert_fields(p)) for p in pumps)
 
     if dumps:
-        msg += "\n🔴 *Top Dumps*\n"
-        for d in dumps:
-            msg += f"  • *{d['symbol']}*  Score: {d['score']}  |  RSI: {d['rsi_1h']}  |  FR: {d['funding_rate_pct']}%\n"
+        parts += ["", "🔴 *Top Dumps*"]
+        parts.extend(_ALERT_LINE.format(*_alert_fields(d)) for d in dumps)
 
     if not pumps and not dumps:
-        msg += "⚪ Market is neutral — no strong pump or dump signals.\n"
+        parts.append("⚪ Market is neutral — no strong pump or dump signals.")
 
-    msg += "\n⚠️ Technical signals only. Use stop-losses."
-    return msg
+    parts += ["", "⚠️ Technical signals only. Use stop-losses."]
+    return "\n".join(parts)
 
 
 # ═══════════════════════════════════════════════════════════════
@@ -419,14 +668,14 @@ async def cmd_help(update: Update, ctx: ContextTypes.DEFAULT_TYPE):
 async def cmd_pump(update: Update, ctx: ContextTypes.DEFAULT_TYPE):
     if not latest_scan:
         await update.message.reply_text("⏳ No scan data yet. Running first scan …")
-        run_scan()
+        await run_scan()
     await update.message.reply_text(fmt_pump_list(latest_scan.get("pumps", [])), parse_mode="Markdown")
 
 
 async def cmd_dump(update: Update, ctx: ContextTypes.DEFAULT_TYPE):
     if not latest_scan:
         await update.message.reply_text("⏳ No scan data yet. Running first scan …")
-        run_scan()
+        await run_scan()
     await update.message.reply_text(fmt_dump_list(latest_scan.get("dumps", [])), parse_mode="Markdown")
 
 
@@ -448,7 +697,7 @@ async def cmd_check(update: Update, ctx: ContextTypes.DEFAULT_TYPE):
     if not record:
         await update.message.reply_text(f"🔄 Fetching live data for *{symbol}* …", parse_mode="Markdown")
         try:
-            record = scan_pair(symbol)
+            record = await scan_symbol(get_session(), symbol)
         except Exception as e:
             await update.message.reply_text(f"❌ Error fetching {symbol}: {e}")
             return
@@ -458,7 +707,7 @@ async def cmd_check(update: Update, ctx: ContextTypes.DEFAULT_TYPE):
 
 async def cmd_scan(update: Update, ctx: ContextTypes.DEFAULT_TYPE):
     await update.message.reply_text("🔄 Running fresh scan … (takes ~1-2 min)")
-    scan = run_scan()
+    scan = await run_scan()
     await update.message.reply_text(fmt_alert(scan), parse_mode="Markdown")
 
 
@@ -472,16 +721,22 @@ async def auto_scan_loop(app):
     max_scans = int(os.environ.get("MAX_SCANS", "0"))  # 0 = infinite
     
     while True:
-        scan = run_scan()
         try:
-            await app.bot.send_message(
-                chat_id=TELEGRAM_CHAT,
-                text=fmt_alert(scan),
-                parse_mode="Markdown",
-            )
-            log.info("Alert posted to Telegram.")
-        except Exception as e:
-            log.error("Failed to send Telegram alert: %s", e)
+            scan = await run_scan()
+        except Exception:
+            # Keep the loop alive; the next interval retries the scan
+            log.exception("Scan failed")
+            scan = None
+        if scan is not None:
+            try:
+                await app.bot.send_message(
+                    chat_id=TELEGRAM_CHAT,
+                    text=fmt_alert(scan),
+                    parse_mode="Markdown",
+                )
+                log.info("Alert posted to Telegram.")
+            except Exception as e:
+                log.error("Failed to send Telegram alert: %s", e)
 
         scan_count += 1
         if max_scans > 0 and scan_count >= max_scans:
@@ -492,10 +747,61 @@ async def auto_scan_loop(app):
         await asyncio.sleep(SCAN_INTERVAL * 60)
 
 
+def _log_task_failure(task: asyncio.Task) -> None:
+    if not task.cancelled() and task.exception() is not None:
+        log.error("Background task %s died", task.get_name(), exc_info=task.exception())
+
+
+async def _post_init(app) -> None:
+    """Start background work once the bot is initialised (polling mode)."""
+    await warm_pool()
+    for coro in (stream_market_state(), auto_scan_loop(app)):
+        task = asyncio.create_task(coro, name=coro.__name__)
+        task.add_done_callback(_log_task_failure)
+        _background.append(task)
+
+
+async def _post_stop(app) -> None:
+    # Runs before app.bot is shut down, so nothing can send on a closed bot
+    for task in _background:
+        task.cancel()
+    await asyncio.gather(*_background, return_exceptions=True)
+    _background.clear()
+
+
+async def _post_shutdown(app) -> None:
+    await close_session()
+
+
+async def _one_shot(app) -> None:
+    try:
+        scan = await run_scan()
+    finally:
+        await close_session()
+    async with app.bot:
+        await app.bot.send_message(
+            chat_id=TELEGRAM_CHAT,
+            text=fmt_alert(scan),
+            parse_mode="Markdown",
+        )
+
+
 def main():
+    if sys.platform != "win32":
+        # libuv-backed event loop, handed to each entry point directly; the event
+        # loop policy API (and uvloop.install(), built on it) is deprecated in 3.14
+        import uvloop
+        run, new_loop = uvloop.run, uvloop.new_event_loop
+    else:
+        run, new_loop = asyncio.run, asyncio.new_event_loop
+
     app = (
         ApplicationBuilder()
         .token(TELEGRAM_TOKEN)
+        .concurrent_updates(True)   # /pump, /check etc. keep working during /scan
+        .post_init(_post_init)
+        .post_stop(_post_stop)
+        .post_shutdown(_post_shutdown)
         .build()
     )
 
@@ -510,19 +816,12 @@ def main():
     # Check if running in "one-shot" mode (for GitHub Actions)
     if os.environ.get("RUN_MODE") == "once":
         log.info("Running in one-shot mode (GitHub Actions)")
-        scan = run_scan()
-        asyncio.get_event_loop().run_until_complete(
-            app.bot.send_message(
-                chat_id=TELEGRAM_CHAT,
-                text=fmt_alert(scan),
-                parse_mode="Markdown",
-            )
-        )
+        run(_one_shot(app))
         log.info("One-shot complete. Exiting.")
     else:
-        # Normal mode: continuous polling with background scans
-        asyncio.get_event_loop().create_task(auto_scan_loop(app))
+        # Normal mode: continuous polling; _post_init starts the background scans
         log.info("Bot starting. First auto-scan will begin immediately.")
+        asyncio.set_event_loop(new_loop())   # run_polling uses the current loop
         app.run_polling()
 
 
@@ -0,0 +1,177 @@
+import asyncio
+
+import aiohttp
+import numpy as np
+import pytest
+from aiohttp import web
+
+import bot
+
+
+def _get_json_against(monkeypatch, handler):
+    """Run bot._get_json("/x") against a local server using `handler`."""
+    async def run():
+        app = web.Application()
+        app.router.add_get("/x", handler)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        await web.TCPSite(runner, "127.0.0.1", 0).start()
+        port = runner.addresses[0][1]
+        monkeypatch.setattr(bot, "BINANCE_BASE", f"http://127.0.0.1:{port}")
+        try:
+            async with aiohttp.ClientSession() as session:
+                return await bot._get_json(session, "/x")
+        finally:
+            await runner.cleanup()
+    return asyncio.run(run())
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Record backoff delays instead of sleeping."""
+    delays = []
+    real_sleep = asyncio.sleep
+
+    async def fake_sleep(seconds, *args):
+        if seconds:   # aiohttp itself yields with sleep(0)
+            delays.append(seconds)
+        await real_sleep(0, *args)
+
+    monkeypatch.setattr(bot.asyncio, "sleep", fake_sleep)
+    return delays
+
+
+def test_get_json_honours_retry_after(monkeypatch, sleeps):
+    calls = []
+
+    async def handler(request):
+        calls.append(request)
+        if len(calls) == 1:
+            return web.Response(status=429, headers={"Retry-After": "7"})
+        return web.json_response({"ok": True})
+
+    assert _get_json_against(monkeypatch, handler) == {"ok": True}
+    assert len(calls) == 2
+    assert sleeps == [7.0]
+
+
+def test_get_json_never_retries_ban(monkeypatch, sleeps):
+    calls = []
+
+    async def handler(request):
+        calls.append(request)
+        return web.Response(status=418)
+
+    with pytest.raises(aiohttp.ClientResponseError) as exc:
+        _get_json_against(monkeypatch, handler)
+    assert exc.value.status == 418
+    assert len(calls) == 1
+    assert sleeps == []
+
+
+@pytest.mark.parametrize("n_bars", [240, 239, 238, 237])
+def test_4h_closes_end_at_newest_bar(n_bars, monkeypatch):
+    closes = np.arange(n_bars, dtype=np.float64)
+
+    async def fake_klines(session, symbol, interval, limit=60):
+        return closes
+
+    async def fake_empty(session, symbol):
+        return None
+
+    rsi_inputs = []
+    monkeypatch.setattr(bot, "fetch_klines", fake_klines)
+    monkeypatch.setattr(bot, "fetch_oi_hist", fake_empty)
+    monkeypatch.setattr(bot, "fetch_long_short_ratio", fake_empty)
+    monkeypatch.setattr(bot, "oi_change", lambda hist: None)
+    monkeypatch.setattr(bot, "calc_rsi", lambda c, period=14: rsi_inputs.append(c))
+
+    asyncio.run(bot.fetch_pair(None, "XUSDT", {"pc": 0.0, "last": 1.0}, None))
+    closes_4h = rsi_inputs[1]
+    assert closes_4h[-1] == n_bars - 1
+    assert np.all(np.diff(closes_4h) == 4)
+
+
+def test_oi_hist_cache_expires_at_hour_boundary(monkeypatch):
+    now = [12 * 3600 + 58 * 60]   # 12:58
+    calls = []
+
+    async def fake_get_json(session, path, params=None):
+        calls.append(now[0])
+        return [{"sumOpenInterest": str(len(calls))}]
+
+    monkeypatch.setattr(bot.time, "time", lambda: now[0])
+    monkeypatch.setattr(bot, "_get_json", fake_get_json)
+    bot.fetch_oi_hist.cache_clear()
+
+    async def fetch():
+        return await bot.fetch_oi_hist(None, "XUSDT")
+
+    first = asyncio.run(fetch())
+    now[0] += 60                   # 12:59: same snapshot, served from cache
+    assert asyncio.run(fetch()) is first
+    now[0] += 4 * 60               # 13:03: the 13:00 snapshot must be fetched
+    assert asyncio.run(fetch()) is not first
+    assert len(calls) == 2
+    bot.fetch_oi_hist.cache_clear()
+
+
+def test_ttl_cache_shares_in_flight_calls():
+    calls = []
+
+    @bot.ttl_cache(ttl=60)
+    async def slow(symbol):
+        calls.append(symbol)
+        await asyncio.sleep(0.01)
+        return {"symbol": symbol}
+
+    async def run():
+        return await asyncio.gather(*(slow("BTCUSDT") for _ in range(5)))
+
+    results = asyncio.run(run())
+    assert calls == ["BTCUSDT"]
+    assert all(r is results[0] for r in results)
+
+
+def test_ttl_cache_drops_failures():
+    calls = []
+
+    @bot.ttl_cache(ttl=60)
+    async def flaky(symbol):
+        calls.append(symbol)
+        if len(calls) == 1:
+            raise RuntimeError("boom")
+        return symbol
+
+    async def run():
+        with pytest.raises(RuntimeError):
+            await flaky("X")
+        return await flaky("X")
+
+    assert asyncio.run(run()) == "X"
+    assert len(calls) == 2
+
+
+def test_auto_scan_loop_survives_failed_scan(monkeypatch, sleeps):
+    outcomes = [RuntimeError("bulk fetch failed"), {"scan": 2}]
+    sent = []
+
+    async def fake_run_scan():
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    class FakeBot:
+        async def send_message(self, **kwargs):
+            sent.append(kwargs["text"])
+
+    class FakeApp:
+        bot = FakeBot()
+
+    monkeypatch.setenv("MAX_SCANS", "2")
+    monkeypatch.setattr(bot, "run_scan", fake_run_scan)
+    monkeypatch.setattr(bot, "fmt_alert", lambda scan: f"alert {scan['scan']}")
+
+    asyncio.run(bot.auto_scan_loop(FakeApp()))
+    assert sent == ["alert 2"]